@@ -1,11 +1,12 @@
 #!/usr/bin/env python3
-import pylast
 import time
 import os
 import sys
 import glob
 import re
-from datetime import datetime
+import threading
+from datetime import datetime, timezone
+from queue import Queue
 from dotenv import load_dotenv
 import json
 import csv
@@ -13,36 +14,325 @@ import csv
 # Load environment variables
 load_dotenv()
 
+# Cached Last.fm session key (avoids a getMobileSession handshake every run)
+SESSION_FILE = "lastfm_session.json"
+
+# pylast error status for an invalid or revoked session key
+STATUS_INVALID_SESSION = "9"
+
+# Last.fm ignores scrobbles older than 14 days, keep a day of margin
+LASTFM_MAX_AGE = 13 * 24 * 60 * 60
+
+# Retry queue for failed songs
+RETRY_DIR = "retry_queue"                     # One queue file per attempt count
+DEAD_LETTER_FILE = "failed_songs_dead.jsonl"  # Songs that ran out of attempts
+RETRY_BATCH_SIZE = 50                         # Same limit as scrobble_many
+RETRY_BASE_DELAY = 300                        # First retry after 5 minutes
+RETRY_MAX_DELAY = 6 * 60 * 60                 # Never wait more than 6 hours
+RETRY_MAX_ATTEMPTS = 8                        # Give up after this many failures
+
+
+def retry_delay(attempts):
+    """Exponential backoff delay in seconds after the given number of failed attempts"""
+    return min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+
+
+# Watch mode
+WATCH_DIR = "SpotifyExports"          # Folder to drop new Spotify exports into
+WATCH_STATE_FILE = "watch_state.json"  # Which exports and plays are already synced
+WATCH_SENT_FILE = "watch_sent.jsonl"   # Plays sent by the current sync, for resuming
+WATCH_INTERVAL = 300                  # Seconds between directory scans
+WATCH_SETTLE_SECONDS = 60             # Skip files modified more recently (still copying)
+WATCH_MIN_MS_PLAYED = 30000           # Only include plays >= 30s
+WATCH_PLAY_QUEUE_SIZE = 1000          # Plays buffered between extract and batch stages
+WATCH_BATCH_QUEUE_SIZE = 4            # Batches buffered between batch and scrobble stages
+
+
+class LastFMConnectionError(Exception):
+    """Raised when logging in to Last.fm fails"""
+
+
+class RetryQueue:
+    """Durable FIFO queue of failed songs, stored as JSON lines on disk.
+
+    Enqueue appends a line to the queue file and dequeue only moves the head
+    offset forward, so both are O(1) per song. The head offset is replaced
+    atomically, which keeps the queue consistent if the process is killed.
+    """
+
+    def __init__(self, path, head_path):
+        self.path = path
+        self.head_path = head_path
+        self.repair()
+        self.head = self.load_head()
+
+    def repair(self):
+        """Drop a half-written last line left behind by an interrupted append"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            pos = end
+            while pos > 0:
+                start = max(0, pos - 4096)
+                f.seek(start)
+                chunk = f.read(pos - start)
+                newline = chunk.rfind(b'\n')
+                if newline != -1:
+                    pos = start + newline + 1
+                    break
+                pos = start
+            if pos != end:
+                f.truncate(pos)
+
+    def load_head(self):
+        """Read the head offset, resetting it if the queue file was drained"""
+        try:
+            with open(self.head_path, 'r') as f:
+                head = int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            head = 0
+
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if head > size:
+            # Crashed between truncating the drained queue and saving the head
+            head = 0
+            self.save_head(head)
+        return head
+
+    def save_head(self, head):
+        tmp_path = self.head_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(str(head))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.head_path)
+
+    def enqueue(self, songs):
+        """Append songs to the tail of the queue"""
+        if not songs:
+            return
+        with open(self.path, 'ab') as f:
+            for song in songs:
+                f.write(json.dumps(song, ensure_ascii=False).encode('utf-8') + b'\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def peek_ready(self, limit, now=None):
+        """Return up to `limit` due songs from the head and the offset just past them"""
+        now = time.time() if now is None else now
+        songs = []
+        offset = self.head
+        if not os.path.exists(self.path):
+            return songs, offset
+
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            while len(songs) < limit:
+                line = f.readline()
+                if not line:
+                    break
+                song = self.parse_line(line)
+                if song is not None and song.get('next_attempt', 0) > now:
+                    break
+                # Unreadable lines are skipped so they get dropped on commit
+                if song is not None:
+                    songs.append(song)
+                offset += len(line)
+        return songs, offset
+
+    def next_due(self):
+        """Return when the song at the head of the queue is due, or None if empty"""
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek(self.head)
+            line = f.readline()
+        if not line:
+            return None
+        song = self.parse_line(line)
+        # An unreadable head is due right away, so peek_ready can skip past it
+        return 0 if song is None else song.get('next_attempt', 0)
+
+    def parse_line(self, line):
+        """Decode one queued song, or return None if the line is damaged"""
+        try:
+            song = json.loads(line.decode('utf-8'))
+        except ValueError:
+            song = None
+        if not isinstance(song, dict) or 'artist' not in song or 'track' not in song:
+            print(f"⚠️ Skipping unreadable line in {self.path}: {line[:100]!r}")
+            return None
+        return song
+
+    def commit(self, offset):
+        """Remove every song before `offset` from the queue"""
+        if offset >= os.path.getsize(self.path):
+            # Queue drained, so start the file over instead of letting it grow
+            with open(self.path, 'wb'):
+                pass
+            offset = 0
+        self.save_head(offset)
+        self.head = offset
+
+    def pending(self):
+        """Count songs still waiting in the queue"""
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, 'rb') as f:
+            f.seek(self.head)
+            return sum(1 for _ in f)
+
+
+class RetrySchedule:
+    """Retry queues for failed songs, one RetryQueue per attempt count.
+
+    Every song in a queue waits the same backoff delay, so songs become due
+    in the order they were added and the head of each queue is always the
+    next song due there. Songs waiting hours never block songs due sooner.
+    """
+
+    def __init__(self, directory=RETRY_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.queues = {}
+        for attempts in range(1, RETRY_MAX_ATTEMPTS):
+            base = os.path.join(directory, f"attempt{attempts}")
+            self.queues[attempts] = RetryQueue(base + ".jsonl", base + ".head")
+
+    def enqueue(self, songs):
+        """Add songs to the queue matching their attempt count"""
+        by_attempts = {}
+        for song in songs:
+            by_attempts.setdefault(song['attempts'], []).append(song)
+        for attempts, group in by_attempts.items():
+            self.queues[attempts].enqueue(group)
+
+    def next_due(self):
+        """Return when the next song is due, or None if every queue is empty"""
+        due = [d for d in (q.next_due() for q in self.queues.values()) if d is not None]
+        return min(due) if due else None
+
+    def peek_ready(self, limit, now=None):
+        """Return (attempts, songs, offset) for due songs from the queue due first"""
+        now = time.time() if now is None else now
+        best = None
+        for attempts, queue in self.queues.items():
+            due = queue.next_due()
+            if due is not None and due <= now and (best is None or due < best[1]):
+                best = (attempts, due)
+        if best is None:
+            return None, [], None
+
+        attempts = best[0]
+        songs, offset = self.queues[attempts].peek_ready(limit, now)
+        return attempts, songs, offset
+
+    def commit(self, attempts, offset):
+        """Remove songs returned by peek_ready from their queue"""
+        self.queues[attempts].commit(offset)
+
+    def pending(self):
+        """Count songs waiting in all queues"""
+        return sum(q.pending() for q in self.queues.values())
+
 
 class LastFMScrobbler:
     def __init__(self):
-        """Initialize Last.fm connection"""
+        """Read Last.fm credentials; the connection is made on first use"""
+        # Get credentials from .env file
+        self.api_key = os.getenv('LASTFM_API_KEY')
+        self.api_secret = os.getenv('LASTFM_API_SECRET')
+        self.username = os.getenv('LASTFM_USERNAME')
+        self.password = os.getenv('LASTFM_PASSWORD')
+
+        self._network = None
+
+    @property
+    def network(self):
+        """Authenticated pylast network, created on the first API call"""
+        if self._network is None:
+            self._network = self.connect()
+        return self._network
+
+    def connect(self):
+        """Connect to Last.fm, reusing a cached session key when possible"""
         try:
-            # Get credentials from .env file
-            API_KEY = os.getenv('LASTFM_API_KEY')
-            API_SECRET = os.getenv('LASTFM_API_SECRET')
-            USERNAME = os.getenv('LASTFM_USERNAME')
-            PASSWORD = os.getenv('LASTFM_PASSWORD')
+            # pylast is slow to import, so only load it when we actually need it
+            import pylast
 
-            if not all([API_KEY, API_SECRET, USERNAME, PASSWORD]):
+            if not all([self.api_key, self.api_secret, self.username, self.password]):
                 raise ValueError("Missing credentials in .env file!")
 
+            session_key = self.load_session_key()
+            if session_key:
+                network = pylast.LastFMNetwork(
+                    api_key=self.api_key,
+                    api_secret=self.api_secret,
+                    username=self.username,
+                    session_key=session_key
+                )
+                print(f"✅ Connected to Last.fm as {self.username} (cached session)")
+                return network
+
             # Generate password hash
-            password_hash = pylast.md5(PASSWORD)
+            password_hash = pylast.md5(self.password)
 
-            # Create network object
-            self.network = pylast.LastFMNetwork(
-                api_key=API_KEY,
-                api_secret=API_SECRET,
-                username=USERNAME,
+            # Create network object (performs the getMobileSession handshake)
+            network = pylast.LastFMNetwork(
+                api_key=self.api_key,
+                api_secret=self.api_secret,
+                username=self.username,
                 password_hash=password_hash
             )
+            self.save_session_key(network.session_key)
 
-            print(f"✅ Connected to Last.fm as {USERNAME}")
+            print(f"✅ Connected to Last.fm as {self.username}")
+            return network
 
         except Exception as e:
-            print(f"❌ Failed to connect to Last.fm: {e}")
-            sys.exit(1)
+            raise LastFMConnectionError(f"Failed to connect to Last.fm: {e}") from e
+
+    def load_session_key(self):
+        """Return the cached session key for the current user, if any"""
+        try:
+            with open(SESSION_FILE, 'r') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if cached.get('username') != self.username or cached.get('api_key') != self.api_key:
+            return None
+        return cached.get('session_key')
+
+    def save_session_key(self, session_key):
+        """Cache the session key on disk for the next run"""
+        if not session_key:
+            return
+        try:
+            # The session key works like a password, so keep it owner-only
+            fd = os.open(SESSION_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            os.chmod(SESSION_FILE, 0o600)  # Also tighten a file left by an older run
+            with os.fdopen(fd, 'w') as f:
+                json.dump({
+                    'username': self.username,
+                    'api_key': self.api_key,
+                    'session_key': session_key
+                }, f, indent=2)
+        except OSError as e:
+            print(f"⚠️ Could not cache session key: {e}")
+
+    def reset_session(self):
+        """Forget a rejected session key so the next call re-authenticates"""
+        self._network = None
+        try:
+            os.remove(SESSION_FILE)
+        except OSError:
+            pass
+
+    def is_invalid_session(self, error):
+        """Check whether a pylast error means the cached session key is no longer valid"""
+        return str(getattr(error, 'status', '')) == STATUS_INVALID_SESSION
 
     def list_part_indices(self, directory="MusicCSV"):
         """Return sorted list of available part indices from MusicCSV/part*.csv"""
@@ -206,8 +496,16 @@ class LastFMScrobbler:
             print(f"❌ Alternative parsing also failed: {e}")
             return []
 
-    def scrobble_batch(self, songs_batch, batch_num, total_batches):
-        """Scrobble a batch of songs (max 50)"""
+    def scrobble_timestamp(self, song, index, current_time):
+        """Use the real play time if Last.fm still accepts it, else back-date from now"""
+        timestamp = song.get('timestamp')
+        if timestamp and timestamp > current_time - LASTFM_MAX_AGE:
+            return timestamp
+        # Each song 3 minutes apart going backwards
+        return current_time - (index * 180)
+
+    def scrobble_batch(self, songs_batch, batch_num, total_batches, failed=None, retried_session=False):
+        """Scrobble a batch of songs (max 50), collecting songs that fail into `failed`"""
         try:
             # Calculate timestamps (scrobbling backwards in time)
             current_time = int(time.time())
@@ -215,8 +513,7 @@ class LastFMScrobbler:
             # Prepare batch for scrobbling
             scrobbles = []
             for i, song in enumerate(songs_batch):
-                # Each song 3 minutes apart going backwards
-                timestamp = current_time - (i * 180)
+                timestamp = self.scrobble_timestamp(song, i, current_time)
 
                 scrobbles.append({
                     'artist': song['artist'],
@@ -227,24 +524,33 @@ class LastFMScrobbler:
             # Scrobble the batch
             self.network.scrobble_many(scrobbles)
 
+            progress = f"{batch_num}/{total_batches}" if total_batches else batch_num
             print(
-                f"✅ Batch {batch_num}/{total_batches} scrobbled successfully ({len(songs_batch)} songs)")
+                f"✅ Batch {progress} scrobbled successfully ({len(songs_batch)} songs)")
             return True
 
+        except LastFMConnectionError:
+            # Not a problem with these songs, let the caller decide what to do
+            raise
         except Exception as e:
+            if self.is_invalid_session(e) and not retried_session:
+                print("🔑 Cached session expired, re-authenticating...")
+                self.reset_session()
+                return self.scrobble_batch(songs_batch, batch_num, total_batches, failed, retried_session=True)
+
             print(f"❌ Error scrobbling batch {batch_num}: {e}")
             # Try to scrobble individually if batch fails
             print("🔄 Attempting individual scrobbles...")
-            return self.scrobble_individually(songs_batch, batch_num)
+            return self.scrobble_individually(songs_batch, batch_num, failed)
 
-    def scrobble_individually(self, songs_batch, batch_num):
+    def scrobble_individually(self, songs_batch, batch_num, failed=None):
         """Fallback method to scrobble songs one by one"""
         success_count = 0
         current_time = int(time.time())
 
         for i, song in enumerate(songs_batch):
             try:
-                timestamp = current_time - (i * 180)
+                timestamp = self.scrobble_timestamp(song, i, current_time)
                 self.network.scrobble(
                     artist=song['artist'],
                     title=song['track'],
@@ -253,8 +559,12 @@ class LastFMScrobbler:
                 success_count += 1
                 print(f"  ✓ Scrobbled: {song['artist']} - {song['track']}")
                 time.sleep(0.5)  # Small delay between individual scrobbles
+            except LastFMConnectionError:
+                raise
             except Exception as e:
                 print(f"  ✗ Failed: {song['artist']} - {song['track']} ({e})")
+                if failed is not None:
+                    failed.append({**song, 'error': type(e).__name__})
 
         print(
             f"📊 Batch {batch_num}: {success_count}/{len(songs_batch)} songs scrobbled individually")
@@ -316,12 +626,11 @@ class LastFMScrobbler:
             print(f"Processing songs {start_idx + 1} to {end_idx}...")
 
             # Scrobble the batch
-            success = self.scrobble_batch(batch, batch_num + 1, total_batches)
+            success = self.scrobble_batch(
+                batch, batch_num + 1, total_batches, failed_songs)
 
             if success:
                 successful_batches += 1
-            else:
-                failed_songs.extend(batch)
 
             # Wait between batches to avoid rate limiting
             if batch_num < total_batches - 1:
@@ -333,22 +642,345 @@ class LastFMScrobbler:
         print("📊 SUMMARY")
         print(f"{'='*50}")
         print(f"✅ Successful batches: {successful_batches}/{total_batches}")
-        print(
-            f"✅ Songs scrobbled: {(successful_batches * batch_size) - (batch_size - len(songs) % batch_size if len(songs) % batch_size != 0 else 0)}")
+        print(f"✅ Songs scrobbled: {len(songs) - len(failed_songs)}")
         print(f"❌ Failed songs: {len(failed_songs)}")
 
-        # Save failed songs if any
+        # Queue failed songs for a later retry
         if failed_songs:
-            failed_file = f"failed_songs_part{file_number}.json"
-            with open(failed_file, 'w') as f:
-                json.dump(failed_songs, f, indent=2)
-            print(f"💾 Failed songs saved to: {failed_file}")
+            self.queue_failed(failed_songs, {'part': file_number})
 
         # Save progress
         self.save_progress(file_number)
 
         return True
 
+    def queue_failed(self, failed_songs, origin, queue=None):
+        """Add songs that failed on their first attempt to the retry queue.
+
+        `origin` says where the songs came from, e.g. {'part': 3} or {'export': 'file.json'}.
+        """
+        queue = queue or RetrySchedule()
+        next_attempt = int(time.time()) + retry_delay(1)
+        queue.enqueue([{
+            **song,
+            **origin,
+            'error': song.get('error', 'Unknown'),
+            'attempts': 1,
+            'next_attempt': next_attempt
+        } for song in failed_songs])
+        print(f"💾 {len(failed_songs)} failed songs added to the retry queue: {RETRY_DIR}/")
+
+    def import_failed_files(self, queue):
+        """Move songs from old failed_songs_partN.json files into the retry queue"""
+        for failed_file in sorted(glob.glob("failed_songs_part*.json")):
+            m = re.match(r"^failed_songs_part(\d+)\.json$", os.path.basename(failed_file))
+            if not m:
+                continue
+            try:
+                with open(failed_file, 'r') as f:
+                    failed_songs = json.load(f)
+            except Exception as e:
+                print(f"⚠️ Could not read {failed_file}: {e}")
+                continue
+
+            if not isinstance(failed_songs, list):
+                print(f"⚠️ {failed_file} is not a list of songs, skipping it")
+                continue
+
+            # Check every entry before touching the file, so bad data can't strand it
+            songs = [song for song in failed_songs
+                     if isinstance(song, dict) and song.get('artist') and song.get('track')]
+            if len(songs) < len(failed_songs):
+                print(f"⚠️ Skipping {len(failed_songs) - len(songs)} entries without artist/track in {failed_file}")
+
+            # Rename before queueing, so a crash can't import the same file twice
+            importing_file = failed_file + ".importing"
+            os.replace(failed_file, importing_file)
+
+            # Same due time as a fresh failure, so the attempt1 queue stays in due order
+            next_attempt = int(time.time()) + retry_delay(1)
+            queue.enqueue([{
+                'artist': str(song['artist']),
+                'track': str(song['track']),
+                'part': int(m.group(1)),
+                'error': 'Unknown',
+                'attempts': 1,
+                'next_attempt': next_attempt
+            } for song in songs])
+            os.replace(importing_file, failed_file + ".queued")
+            print(f"📥 Imported {len(songs)} songs from {failed_file}")
+
+        for importing_file in sorted(glob.glob("failed_songs_part*.json.importing")):
+            print(f"⚠️ {importing_file} was only partly imported by an interrupted run, check it by hand")
+
+    def retry_failed(self):
+        """Re-scrobble queued failed songs with exponential backoff until the queue is empty"""
+        queue = RetrySchedule()
+        self.import_failed_files(queue)
+
+        remaining = queue.pending()
+        if not remaining:
+            print("✅ Retry queue is empty!")
+            return
+
+        print(f"\n🔁 {remaining} songs waiting in the retry queue")
+        print("⌨️ Press Ctrl+C to stop, unfinished songs stay queued\n")
+
+        batch_num = 0
+        try:
+            while True:
+                due = queue.next_due()
+                if due is None:
+                    break
+
+                wait = due - time.time()
+                if wait > 0:
+                    due_at = datetime.fromtimestamp(due).strftime('%Y-%m-%d %H:%M:%S')
+                    print(f"⏳ Next retry due at {due_at}, waiting {int(wait)} seconds...")
+                    time.sleep(wait)
+                    continue
+
+                total_batches = batch_num + \
+                    (remaining + RETRY_BATCH_SIZE - 1) // RETRY_BATCH_SIZE
+                tried, requeued = self.retry_next_batch(
+                    queue, batch_num + 1, total_batches) or (0, 0)
+                if not tried:
+                    continue
+
+                batch_num += 1
+                remaining -= tried - requeued
+
+                # Wait between batches to avoid rate limiting
+                if remaining:
+                    time.sleep(3)
+
+        except KeyboardInterrupt:
+            print(f"\n⏸️ Stopped, {queue.pending()} songs still in the retry queue")
+            return
+
+        print("✅ Retry queue is empty!")
+
+    def retry_due(self, queue):
+        """Retry every queued song that is already due, without waiting for later ones"""
+        batch_num = 0
+        while True:
+            try:
+                result = self.retry_next_batch(queue, batch_num + 1)
+            except LastFMConnectionError as e:
+                # The batch was not committed, so it stays queued for the next scan
+                print(f"⚠️ {e}, retrying queued songs later")
+                return
+            if result is None:
+                return
+            if result[0]:
+                batch_num += 1
+                time.sleep(3)  # Wait between batches to avoid rate limiting
+
+    def retry_next_batch(self, queue, batch_num, total_batches=None):
+        """Retry one batch of due songs; return (tried, rescheduled) or None if nothing is due"""
+        attempts, batch, offset = queue.peek_ready(RETRY_BATCH_SIZE)
+        if attempts is None:
+            return None
+        if not batch:
+            # Only unreadable lines at the head, drop them
+            queue.commit(attempts, offset)
+            return 0, 0
+
+        failed = []
+        self.scrobble_batch(batch, batch_num, total_batches, failed)
+
+        # Reschedule failures before dropping the batch from the queue,
+        # so a crash in between can only cause a repeat, never a loss
+        requeue, dead = [], []
+        now = int(time.time())
+        for song in failed:
+            song['attempts'] = song.get('attempts', 1) + 1
+            if song['attempts'] >= RETRY_MAX_ATTEMPTS:
+                song['dead_at'] = datetime.now().isoformat()
+                dead.append(song)
+            else:
+                song['next_attempt'] = now + retry_delay(song['attempts'])
+                requeue.append(song)
+
+        queue.enqueue(requeue)
+        self.save_dead_letters(dead)
+        queue.commit(attempts, offset)
+
+        print(
+            f"📊 Retried {len(batch)}: {len(batch) - len(failed)} scrobbled, {len(requeue)} rescheduled, {len(dead)} given up")
+        return len(batch), len(requeue)
+
+    def save_dead_letters(self, songs):
+        """Append songs that used up all their attempts to the dead-letter file"""
+        if not songs:
+            return
+        with open(DEAD_LETTER_FILE, 'a', encoding='utf-8') as f:
+            for song in songs:
+                f.write(json.dumps(song, ensure_ascii=False) + '\n')
+        print(f"🪦 {len(songs)} songs gave up after {RETRY_MAX_ATTEMPTS} attempts, saved to: {DEAD_LETTER_FILE}")
+
+    def watch(self, directory=WATCH_DIR):
+        """Keep scanning the export folder, scrobble plays from new exports and retry failures"""
+        os.makedirs(directory, exist_ok=True)
+        retry_queue = RetrySchedule()
+        print(f"👀 Watching {directory}/ for new Spotify exports every {WATCH_INTERVAL} seconds")
+        print("⌨️ Press Ctrl+C to stop, progress is saved after every batch\n")
+
+        try:
+            while True:
+                try:
+                    state = load_watch_state()
+                except (OSError, ValueError) as e:
+                    # Starting over would set a new baseline and skip unsynced plays
+                    print(f"❌ Could not read {WATCH_STATE_FILE}: {e}")
+                    print("🛑 Fix or remove it by hand, stopping so no plays are skipped")
+                    return
+                new_files = find_new_exports(directory, state)
+
+                if state is None:
+                    self.set_watch_baseline(new_files)
+                elif new_files:
+                    self.sync_exports(new_files, state, retry_queue)
+
+                # Failed songs are retried here, so --retry isn't needed alongside watch mode
+                self.retry_due(retry_queue)
+
+                time.sleep(WATCH_INTERVAL)
+        except KeyboardInterrupt:
+            print("\n👋 Stopped watching")
+
+    def set_watch_baseline(self, files):
+        """On the first run, mark existing exports as synced without scrobbling them"""
+        state = {'watermark': 0, 'files': {}}
+        for path, signature in files:
+            for item in iter_export_items(path):
+                ts = play_timestamp(item)
+                if ts is not None and ts > state['watermark']:
+                    state['watermark'] = ts
+            state['files'][path] = signature
+
+        # Nothing to compare against yet, so only plays from now on are new
+        if not state['watermark']:
+            state['watermark'] = int(time.time())
+        save_watch_state(state)
+
+        since = datetime.fromtimestamp(state['watermark']).strftime('%Y-%m-%d %H:%M:%S')
+        print(f"📌 Baseline set from {len(files)} existing files, only plays after {since} will be scrobbled")
+
+    def sync_exports(self, files, state, retry_queue):
+        """Stream new plays through extract -> filter -> batch -> scrobble"""
+        since = state['watermark']
+        # Plays already sent by an interrupted sync, including from files marked done
+        sent = load_sent_keys()
+        newest = max([since] + [key[0] for key in sent])
+        plays = Queue(maxsize=WATCH_PLAY_QUEUE_SIZE)
+        batches = Queue(maxsize=WATCH_BATCH_QUEUE_SIZE)
+
+        print(f"\n{'='*50}")
+        print(f"📂 Syncing {len(files)} new export files")
+        print(f"📅 Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"{'='*50}\n")
+
+        def extract():
+            try:
+                for path, signature in files:
+                    for item in iter_export_items(path):
+                        plays.put(('play', (path, item)))
+                    plays.put(('file_done', (path, signature)))
+                plays.put(('end', None))
+            except Exception as e:
+                plays.put(('error', e))
+
+        def batch():
+            seen = set(sent)
+            songs = []
+            path = None
+            kind = None
+            try:
+                while True:
+                    kind, value = plays.get()
+                    if kind == 'play':
+                        path, item = value
+                        song = new_play(item, since, seen)
+                        if song is None:
+                            continue
+                        songs.append(song)
+                        if len(songs) == RETRY_BATCH_SIZE:
+                            batches.put(('batch', (path, songs)))
+                            songs = []
+                        continue
+
+                    if songs:
+                        batches.put(('batch', (path, songs)))
+                        songs = []
+                    batches.put((kind, value))
+                    if kind in ('end', 'error'):
+                        return
+            except Exception as e:
+                batches.put(('error', e))
+                # Keep reading so the extract stage isn't left blocked on a full queue
+                while kind not in ('end', 'error'):
+                    kind, _ = plays.get()
+
+        for stage in (extract, batch):
+            threading.Thread(target=stage, daemon=True).start()
+
+        batch_num = 0
+        total_songs = 0
+        total_failed = 0
+        total_old = 0
+        while True:
+            kind, value = batches.get()
+            if kind == 'error':
+                print(f"❌ Sync stopped, will try again on the next scan: {value}")
+                return False
+            if kind == 'end':
+                break
+            if kind == 'file_done':
+                path, signature = value
+                state['files'][path] = signature
+                save_watch_state(state)
+                continue
+
+            path, songs = value
+            if batch_num:
+                time.sleep(3)  # Wait between batches to avoid rate limiting
+            batch_num += 1
+
+            too_old = sum(1 for song in songs if song['timestamp'] <= time.time() - LASTFM_MAX_AGE)
+            if too_old:
+                print(f"🕰️ {too_old} plays are too old for Last.fm, scrobbling them with recent times")
+
+            failed = []
+            try:
+                self.scrobble_batch(songs, batch_num, None, failed)
+            except LastFMConnectionError as e:
+                # Handle a failed login like a failed batch, so the daemon keeps running
+                print(f"❌ {e}")
+                failed = [{**song, 'error': type(e).__name__} for song in songs]
+            if failed:
+                self.queue_failed(failed, {'export': os.path.basename(path)}, retry_queue)
+            append_sent_keys(songs)
+
+            total_songs += len(songs)
+            total_failed += len(failed)
+            total_old += too_old
+            newest = max([newest] + [song['played_at'] for song in songs])
+
+        state['watermark'] = newest
+        save_watch_state(state)
+        if os.path.exists(WATCH_SENT_FILE):
+            os.remove(WATCH_SENT_FILE)
+
+        print(f"\n{'='*50}")
+        print("📊 SUMMARY")
+        print(f"{'='*50}")
+        print(f"✅ Songs scrobbled: {total_songs - total_failed}")
+        print(f"🕰️ Scrobbled with recent times: {total_old}")
+        print(f"❌ Failed songs: {total_failed}")
+        print(f"{'='*50}\n")
+        return True
+
     def save_progress(self, file_number):
         """Save progress to track which files have been processed"""
         progress_file = "scrobble_progress.json"
@@ -406,7 +1038,194 @@ class LastFMScrobbler:
         return completed
 
 
-def main():
+def play_timestamp(item):
+    """Return when a play ended as a Unix timestamp, across export formats"""
+    ts = item.get('ts')  # Extended streaming history: 2024-05-01T12:34:56Z
+    if ts:
+        try:
+            return int(datetime.strptime(ts, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc).timestamp())
+        except (TypeError, ValueError):
+            return None
+    end_time = item.get('endTime')  # StreamingHistory: 2024-05-01 12:34
+    if end_time:
+        try:
+            return int(datetime.strptime(end_time, '%Y-%m-%d %H:%M').replace(tzinfo=timezone.utc).timestamp())
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+def iter_export_items(path, chunk_size=1 << 16):
+    """Yield history items from one Spotify export file, reading it in chunks"""
+    decoder = json.JSONDecoder()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            buf, pos, eof = '', 0, False
+            while True:
+                # Skip whitespace and the brackets/commas between history items
+                while pos < len(buf) and (buf[pos].isspace() or buf[pos] in '[],'):
+                    pos += 1
+                if pos == len(buf):
+                    buf, pos = f.read(chunk_size), 0
+                    if not buf:
+                        return
+                    continue
+
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                    # A number or string at the end of the buffer may be cut off
+                    if end == len(buf) and not eof and not isinstance(value, dict):
+                        raise ValueError("value may continue in the next chunk")
+                except ValueError:
+                    if eof:
+                        # Damaged item, try to resync to the next JSON object
+                        pos = buf.find('{', pos + 1)
+                        if pos == -1:
+                            return
+                        continue
+                    chunk = f.read(chunk_size)
+                    eof = not chunk
+                    buf, pos = buf[pos:] + chunk, 0
+                    continue
+
+                pos = end
+                if isinstance(value, dict):
+                    yield value
+    except Exception:
+        # Ignore unreadable/invalid files
+        return
+
+
+# _first_nonempty, extract_pair and extract_duration_ms are copied from
+# "json to csv/converter.py" (the two scripts live in separate folders).
+# Keep both copies in sync.
+def _first_nonempty(d: dict, keys):
+    for k in keys:
+        v = d.get(k)
+        if v not in (None, "", []):
+            return v
+    return None
+
+
+def extract_pair(item):
+    """Extract (artist, track) from a history item across multiple export formats."""
+    artist = _first_nonempty(item, [
+        'master_metadata_album_artist_name',  # endsong
+        'artistName',                         # StreamingHistory
+        'artist',                             # generic fallback
+    ])
+    track = _first_nonempty(item, [
+        'master_metadata_track_name',         # endsong
+        'trackName',                          # StreamingHistory
+        'track',                              # generic fallback
+        'song',                               # some exports
+    ])
+
+    if artist and track:
+        return str(artist), str(track)
+    return None
+
+
+def extract_duration_ms(item):
+    """Best-effort extraction of play duration in ms across formats."""
+    for k in ('ms_played', 'msPlayed', 'playback_duration_ms', 'playbackDurationMs', 'duration_ms'):
+        if k in item and item[k] is not None:
+            try:
+                return int(item[k])
+            except (TypeError, ValueError):
+                pass
+    return None
+
+
+def new_play(item, since, seen):
+    """Turn a history item into a song if it is a new, long enough music play"""
+    pair = extract_pair(item)
+    duration = extract_duration_ms(item)
+    played_at = play_timestamp(item)
+
+    if not pair or duration is None or duration < WATCH_MIN_MS_PLAYED:
+        return None
+    if played_at is None or played_at <= since:
+        return None
+
+    # The same play can show up in more than one export file
+    artist, track = pair
+    key = (played_at, artist, track)
+    if key in seen:
+        return None
+    seen.add(key)
+
+    # Spotify records when the play ended, Last.fm wants when it started
+    return {'artist': artist, 'track': track, 'played_at': played_at,
+            'timestamp': played_at - duration // 1000}
+
+
+def find_new_exports(directory, state):
+    """Return (path, signature) for finished export files not synced yet"""
+    synced = (state or {}).get('files', {})
+    now = time.time()
+    found = []
+    for path in sorted(glob.glob(os.path.join(directory, '**', '*.json'), recursive=True)):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if now - stat.st_mtime < WATCH_SETTLE_SECONDS:
+            continue
+        signature = [stat.st_size, int(stat.st_mtime)]
+        if synced.get(path) != signature:
+            found.append((path, signature))
+    return found
+
+
+def load_sent_keys():
+    """Load (played_at, artist, track) of plays sent by an interrupted sync"""
+    keys = set()
+    try:
+        with open(WATCH_SENT_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    played_at, artist, track = json.loads(line)
+                except ValueError:
+                    continue  # Half-written line from a crash
+                keys.add((played_at, artist, track))
+    except OSError:
+        pass
+    return keys
+
+
+def append_sent_keys(songs):
+    """Record plays sent in this sync so a resumed sync skips exactly these"""
+    with open(WATCH_SENT_FILE, 'a', encoding='utf-8') as f:
+        for song in songs:
+            f.write(json.dumps([song['played_at'], song['artist'], song['track']],
+                               ensure_ascii=False) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def load_watch_state():
+    """Load watch mode state, or None before the first run"""
+    try:
+        with open(WATCH_STATE_FILE, 'r') as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return None
+
+    if not isinstance(state, dict) or 'watermark' not in state or 'files' not in state:
+        raise ValueError("unexpected contents")
+    return state
+
+
+def save_watch_state(state):
+    """Save watch mode state atomically"""
+    tmp_path = WATCH_STATE_FILE + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, WATCH_STATE_FILE)
+
+
+def main(argv):
     """Main function"""
     print("""
     ╔═══════════════════════════════════════════════════╗
@@ -414,9 +1233,19 @@ def main():
     ╚═══════════════════════════════════════════════════╝
     """)
 
-    # Create scrobbler instance
+    # Create scrobbler instance (connects to Last.fm only when scrobbling)
     scrobbler = LastFMScrobbler()
 
+    # Retry queued failed songs without going through the menu
+    if argv and argv[0] == '--retry':
+        scrobbler.retry_failed()
+        return
+
+    # Continuously sync new Spotify exports
+    if argv and argv[0] == '--watch':
+        scrobbler.watch(argv[1] if len(argv) > 1 else WATCH_DIR)
+        return
+
     # Find available part files dynamically
     available = scrobbler.list_part_indices()
     if not available:
@@ -430,6 +1259,7 @@ def main():
     # Get next file to process
     if not remaining:
         print("✅ All files have been processed!")
+        print("🔁 Run with --retry to re-scrobble songs that failed")
         return
 
     next_file = remaining[0]
@@ -439,10 +1269,11 @@ def main():
     print("1. Process next file automatically")
     print("2. Choose a specific file")
     print("3. Check a CSV file for issues")
-    print("4. Exit")
+    print("4. Retry failed songs")
+    print("5. Exit")
 
     nums_list = ", ".join(str(i) for i in available)
-    choice = input("\nEnter your choice (1-4): ")
+    choice = input("\nEnter your choice (1-5): ")
 
     if choice == '1':
         scrobbler.process_file(next_file)
@@ -475,10 +1306,16 @@ def main():
         else:
             print("❌ Invalid file number!")
     elif choice == '4':
+        scrobbler.retry_failed()
+    elif choice == '5':
         print("👋 Goodbye!")
     else:
         print("❌ Invalid choice!")
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main(sys.argv[1:])
+    except LastFMConnectionError as e:
+        print(f"❌ {e}")
+        sys.exit(1)